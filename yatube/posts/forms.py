@@ -5,20 +5,23 @@ from .models import Comment, Post
 
 User = get_user_model()
 
+_POST_LABELS = {
+    'text': 'Текст поста', 'group': 'Группа',
+    'image': 'Изображение'
+}
+_POST_HELP = {
+    'text': 'Заполните текст, который будет в новой записи',
+    'group': 'Выберите группу, к которой будет относиться пост',
+    'image': 'Выберите изображение'
+}
+
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
-        labels = {
-            'text': 'Текст поста', 'group': 'Группа',
-            'image': 'Изображение'
-        }
-        help_texts = {
-            'text': 'Заполните текст, который будет в новой записи',
-            'group': 'Выберите группу, к которой будет относиться пост',
-            'image': 'Выберите изображение'
-        }
+        labels = _POST_LABELS
+        help_texts = _POST_HELP
 
 
 class CommentForm(forms.ModelForm):
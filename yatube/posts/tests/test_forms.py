@@ -2,11 +2,11 @@ import shutil
 import tempfile
 
 from django.contrib.auth import get_user_model
-from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..models import Comment, Group, Post
+from .utils import make_gif_upload
 
 
 User = get_user_model()
@@ -16,12 +16,8 @@ TEMP_MEDIA_ROOT = tempfile.mkdtemp()
 
 class CommentFormTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user = User.objects.create(username='Comments')
-        cls.guest_client = Client()
-        cls.authorized_client = Client()
-        cls.authorized_client.force_login(cls.user)
         cls.group_test = Group.objects.create(
             title='Тестовая группа',
             slug='test',
@@ -38,6 +34,11 @@ class CommentFormTest(TestCase):
             author=cls.user
         )
 
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
     def test_authorized_comment_add(self):
         """Проверка что авторизованный пользователь может добавить
         комментарий.
@@ -79,7 +80,7 @@ class PostFormsTest(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        cls.author = User.objects.create_user(username='auth')
+        cls.author = User.objects.create(username='auth')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='test_slug',
@@ -90,14 +91,6 @@ class PostFormsTest(TestCase):
             text='Тестовый пост для тестирования',
             group=cls.group
         )
-        cls.gif = (
-            b'\x47\x49\x46\x38\x39\x61\x02\x00'
-            b'\x01\x00\x80\x00\x00\x00\x00\x00'
-            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
-            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
-            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
-            b'\x0A\x00\x3B'
-        )
 
     @classmethod
     def tearDownClass(cls):
@@ -110,17 +103,11 @@ class PostFormsTest(TestCase):
 
     def test_create_post(self):
         """Валидная форма создания поста с гифкой."""
-        posts_count = Post.objects.count()
-        uploaded = SimpleUploadedFile(
-            name='small.gif',
-            content=self.gif,
-            content_type='image/gif'
-        )
         form_data = {
             'text': 'текст',
             'author': self.author,
             'group': self.group.id,
-            'image': uploaded
+            'image': make_gif_upload()
         }
         response = self.authorized_client.post(reverse('posts:post_create'),
                                                data=form_data, follow=True)
@@ -128,11 +115,12 @@ class PostFormsTest(TestCase):
                              reverse('posts:profile',
                                      kwargs={'username':
                                              self.author.username}))
-        self.assertEqual(Post.objects.count(), posts_count + 1)
-        self.assertTrue(Post.objects.filter(text='текст',
-                                            author=self.author).exists())
-        self.assertEqual(response.context['page_obj'].object_list[0].image,
-                         'posts/small.gif')
+        new_post = Post.objects.latest('pk')
+        self.assertNotEqual(new_post.pk, self.post.pk)
+        self.assertEqual(new_post.text, 'текст')
+        self.assertEqual(new_post.author, self.author)
+        self.assertEqual(new_post.group, self.group)
+        self.assertEqual(new_post.image, 'posts/small.gif')
 
     def test_edit_post(self):
         """Валидная форма редактировани поста."""
@@ -149,9 +137,6 @@ class PostFormsTest(TestCase):
         )
         self.assertRedirects(response, reverse('posts:post_detail', args=(1,)))
         self.assertEqual(Post.objects.count(), posts_count)
-        self.assertTrue(
-            Post.objects.filter(
-                text='отредактированный текст',
-                group=self.group.id,
-            ).exists()
-        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'отредактированный текст')
+        self.assertEqual(self.post.group, self.group)
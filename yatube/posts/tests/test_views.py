@@ -4,24 +4,53 @@ import tempfile
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django import forms
 
 from ..models import Comment, Follow, Group, Post
+from .utils import make_gif_upload
 
 User = get_user_model()
 
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+# Сессия и пользователь для авторизованного клиента.
+NUM_QUERIES_AUTHENTICATED = 2
+# Подсчёт постов для паджинатора и выборка страницы с автором и группой.
+NUM_QUERIES_PAGE = 2
+NUM_QUERIES_INDEX = NUM_QUERIES_AUTHENTICATED + NUM_QUERIES_PAGE
+# Дополнительно выборка группы.
+NUM_QUERIES_GROUP_LIST = NUM_QUERIES_INDEX + 1
+# Для пустой группы паджинатор не выбирает страницу.
+NUM_QUERIES_EMPTY_GROUP_LIST = NUM_QUERIES_GROUP_LIST - 1
+# Дополнительно выборка автора и подсчёт его постов.
+NUM_QUERIES_PROFILE = NUM_QUERIES_INDEX + 2
+# Подписки фильтруются в том же запросе, что и выборка страницы.
+NUM_QUERIES_FOLLOW_INDEX = NUM_QUERIES_INDEX
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+DUMMY_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+@override_settings(
+    CACHES=DUMMY_CACHES,
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+)
 class PostViewTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.author = User.objects.create_user(username='author')
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.user = User.objects.create(username='user')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='test_slug',
@@ -32,25 +61,24 @@ class PostViewTests(TestCase):
             slug='test_slug_2',
             description='test_description_2',
         )
-        cls.gif = (
-            b'\x47\x49\x46\x38\x39\x61\x02\x00'
-            b'\x01\x00\x80\x00\x00\x00\x00\x00'
-            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
-            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
-            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
-            b'\x0A\x00\x3B'
-        )
-        cls.uploaded = SimpleUploadedFile(
-            name='small.gif',
-            content=cls.gif,
-            content_type='image/gif'
-        )
         cls.post = Post.objects.create(
             author=cls.author,
             group=cls.group,
             text='test_post',
-            image=cls.uploaded
+            image=make_gif_upload()
         )
+        cls.url_index = reverse('posts:index')
+        cls.url_group_list = reverse(
+            'posts:group_list', kwargs={'slug': cls.group.slug})
+        cls.url_group_list_2 = reverse(
+            'posts:group_list', kwargs={'slug': cls.group_2.slug})
+        cls.url_profile = reverse(
+            'posts:profile', kwargs={'username': cls.author.username})
+        cls.url_post_create = reverse('posts:post_create')
+        cls.url_post_detail = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.id})
+        cls.url_post_edit = reverse(
+            'posts:post_edit', kwargs={'post_id': cls.post.id})
 
     @classmethod
     def tearDownClass(cls):
@@ -59,25 +87,26 @@ class PostViewTests(TestCase):
 
     def setUp(self):
         self.guest_client = Client()
-        self.user = User.objects.create_user(username='user')
-        self.authorized_client = Client()
-        self.authorized_client.force_login(self.user)
         self.authorized_author = Client()
         self.authorized_author.force_login(self.author)
 
+    def _assert_post_matches(self, context, post):
+        """Пост из контекста совпадает с ожидаемым."""
+        self.assertEqual(
+            (context.text, context.author_id, context.group_id,
+             context.image.name),
+            (post.text, post.author_id, post.group_id, post.image.name),
+        )
+
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
         templates_page_names = {
-            reverse('posts:index'): 'posts/index.html',
-            reverse('posts:group_list', kwargs={
-                'slug': self.group.slug}): 'posts/group_list.html',
-            reverse('posts:post_create'): 'posts/create_post.html',
-            reverse('posts:post_edit', kwargs={
-                'post_id': self.post.id}): 'posts/create_post.html',
-            reverse('posts:post_detail', kwargs={
-                'post_id': self.post.id}): 'posts/post_detail.html',
-            reverse('posts:profile', kwargs={
-                'username': self.author.username}): 'posts/profile.html',
+            self.url_index: 'posts/index.html',
+            self.url_group_list: 'posts/group_list.html',
+            self.url_post_create: 'posts/create_post.html',
+            self.url_post_edit: 'posts/create_post.html',
+            self.url_post_detail: 'posts/post_detail.html',
+            self.url_profile: 'posts/profile.html',
         }
         for reverse_name, template in templates_page_names.items():
             with self.subTest(template=template):
@@ -86,68 +115,52 @@ class PostViewTests(TestCase):
 
     def test_index_show_correct_context(self):
         """Шаблон index сформирован с правильным контекстом."""
-        response = self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(self.url_index)
         self.assertIn('page_obj', response.context)
         context = response.context['page_obj'][0]
-        self.assertEqual(context.text, self.post.text)
-        self.assertEqual(context.author, self.author)
-        self.assertEqual(context.group, self.group)
-        self.assertEqual(context.image, self.post.image)
+        self._assert_post_matches(context, self.post)
 
     def test_group_list_show_correct_context(self):
         """Шаблон group_list сформирован с правильным контекстом."""
-        response = self.guest_client.get(reverse('posts:group_list', kwargs={
-            'slug': self.group.slug}))
+        response = self.guest_client.get(self.url_group_list)
         self.assertIn('page_obj', response.context)
         context = response.context['page_obj'][0]
-        self.assertEqual(context.text, self.post.text)
-        self.assertEqual(context.author, self.author)
-        self.assertEqual(context.group, self.group)
-        self.assertEqual(context.image, self.post.image)
+        self._assert_post_matches(context, self.post)
 
     def test_profile_show_correct_context(self):
         """Шаблон profile сформирован с правильным контекстом."""
-        response = self.authorized_author.get(reverse('posts:profile', kwargs={
-            'username': self.author.username}))
+        response = self.authorized_author.get(self.url_profile)
         context = response.context['page_obj'][0]
-        self.assertEqual(context.text, self.post.text)
-        self.assertEqual(context.author, self.author)
-        self.assertEqual(context.group, self.group)
-        self.assertEqual(context.image, self.post.image)
+        self._assert_post_matches(context, self.post)
 
     def test_post_detail_show_correct_context(self):
         """Шаблон post_detail сформирован с правильным контекстом."""
-        response = self.authorized_author.get(
-            reverse('posts:post_detail', kwargs={
-                'post_id': self.post.id}))
+        response = self.authorized_author.get(self.url_post_detail)
         context = response.context['post']
-        self.assertEqual(context.text, self.post.text)
-        self.assertEqual(context.author, self.author)
-        self.assertEqual(context.image, self.post.image)
+        self._assert_post_matches(context, self.post)
 
     def test_edit_post_show_correct_context(self):
         """Шаблон edit_post сформирован с правильным контекстом."""
-        response = self.authorized_author.get(reverse(
-            'posts:post_edit', kwargs={'post_id': self.post.id}))
+        response = self.authorized_author.get(self.url_post_edit)
 
         form_fields = {
             'text': forms.fields.CharField,
             'group': forms.models.ModelChoiceField,
         }
 
+        fields = response.context['form'].fields
         for value, expected in form_fields.items():
             with self.subTest(value=value):
-                form_field = response.context.get('form').fields.get(value)
-                self.assertIsInstance(form_field, expected)
+                self.assertIsInstance(fields[value], expected)
 
     def test_check_post_on_create(self):
         """Проверка, что пост добавляется в index, group_list
          и profile при указании группы.
          """
         pages = [
-            reverse('posts:index'),
-            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
-            reverse('posts:profile', kwargs={'username': self.author}),
+            self.url_index,
+            self.url_group_list,
+            self.url_profile,
         ]
         for page in pages:
             with self.subTest(page=page):
@@ -157,93 +170,101 @@ class PostViewTests(TestCase):
 
     def test_post_in_group(self):
         """Проверка, что пост не находится в другой группе."""
-        response = self.authorized_author.get(
-            reverse('posts:group_list', kwargs={'slug': self.group_2.slug}))
+        with self.assertNumQueries(NUM_QUERIES_EMPTY_GROUP_LIST):
+            response = self.authorized_author.get(self.url_group_list_2)
         self.assertEqual(len(response.context['page_obj']), 0)
 
+    @override_settings(CACHES=LOCMEM_CACHES)
     def test_index_cache_context(self):
         """Проверка, что кеш работает на главной странице"""
-        response1 = self.authorized_client.get(reverse("posts:index"))
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        cache.clear()
+        response1 = authorized_client.get(self.url_index)
         Post.objects.create(
             author=self.user,
             text=self.post.text,
         )
-        response2 = self.authorized_client.get(reverse("posts:index"))
+        response2 = authorized_client.get(self.url_index)
         self.assertEqual(response1.content, response2.content)
         cache.clear()
-        response3 = self.authorized_client.get(reverse("posts:index"))
+        response3 = authorized_client.get(self.url_index)
         self.assertNotEqual(response1.content, response3.content)
 
 
+@override_settings(CACHES=DUMMY_CACHES)
 class PaginatorViewTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.author = User.objects.create_user(username='Author')
-        cls.authorized_author = Client()
-        cls.authorized_author.force_login(cls.author)
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Author')
         cls.group = Group.objects.create(
             title='Тестовая группа 3',
             slug='test-slug_3',
             description='test_description_3',
         )
-        cls.page_obj = []
-
-        for i in range(13):
-            cls.page_obj.append(
-                Post(
-                    author=cls.author,
-                    text=f'{i} test_text',
-                    group=cls.group,
-                )
+        Post.objects.bulk_create(
+            Post(
+                author=cls.author,
+                text=f'{i} test_text',
+                group=cls.group,
             )
-        cls.posts = Post.objects.bulk_create(cls.page_obj)
+            for i in range(13)
+        )
+
+    def setUp(self):
+        self.authorized_author = Client()
+        self.authorized_author.force_login(self.author)
 
     def test_first_page_contains_ten_records(self):
         """Первая страница index содержит десять записей."""
-        response = self.authorized_author.get(reverse('posts:index'))
+        with self.assertNumQueries(NUM_QUERIES_INDEX):
+            response = self.authorized_author.get(reverse('posts:index'))
         self.assertEqual(len(response.context['page_obj']), 10)
 
     def test_second_page_contains_three_records(self):
         """Вторая страница index содердит три записи."""
-        response = self.authorized_author.get(
-            reverse('posts:index') + '?page=2')
+        with self.assertNumQueries(NUM_QUERIES_INDEX):
+            response = self.authorized_author.get(
+                reverse('posts:index') + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 3)
 
     def test_group_list_first_page_contains_ten_records(self):
         """Первая страница group_list содержит десять записей.."""
-        response = self.authorized_author.get(
-            reverse('posts:group_list', kwargs={
-                    'slug': self.group.slug}))
+        with self.assertNumQueries(NUM_QUERIES_GROUP_LIST):
+            response = self.authorized_author.get(
+                reverse('posts:group_list', kwargs={
+                        'slug': self.group.slug}))
         self.assertEqual(len(response.context['page_obj']), 10)
 
     def test_group_list_second_page_contains_three_records(self):
         """Вторая страница group_list содердит три записи."""
-        response = self.authorized_author.get(
-            reverse('posts:group_list', kwargs={
-                    'slug': self.group.slug}) + '?page=2')
+        with self.assertNumQueries(NUM_QUERIES_GROUP_LIST):
+            response = self.authorized_author.get(
+                reverse('posts:group_list', kwargs={
+                        'slug': self.group.slug}) + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 3)
 
     def test_profile_first_page_contains_ten_records(self):
         """Первая страница profile содержит десять записей."""
-        response = self.authorized_author.get(reverse('posts:profile', kwargs={
-            'username': self.author.username}))
+        with self.assertNumQueries(NUM_QUERIES_PROFILE):
+            response = self.authorized_author.get(
+                reverse('posts:profile', kwargs={
+                        'username': self.author.username}))
         self.assertEqual(len(response.context['page_obj']), 10)
 
     def test_profile_second_page_contains_three_records(self):
         """Вторая страница profile содердит три записи."""
-        response = self.authorized_author.get(reverse('posts:profile', kwargs={
-            'username': self.author.username}) + '?page=2')
+        with self.assertNumQueries(NUM_QUERIES_PROFILE):
+            response = self.authorized_author.get(
+                reverse('posts:profile', kwargs={
+                        'username': self.author.username}) + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 3)
 
 
 class ComentTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user = User.objects.create(username='Comments')
-        cls.authorized_client = Client()
-        cls.authorized_client.force_login(cls.user)
         cls.group_test = Group.objects.create(
             title='Тестовая группа',
             slug='test',
@@ -260,6 +281,10 @@ class ComentTest(TestCase):
             author=cls.user
         )
 
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
     def test_comment_add_on_page(self):
         """Проверка что комментарий добавился к посту."""
         post_id = self.post_test.pk
@@ -271,17 +296,13 @@ class ComentTest(TestCase):
         self.assertEqual(context.author, self.comment_test.author)
 
 
+@override_settings(CACHES=DUMMY_CACHES)
 class FollowTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user_1 = User.objects.create(username='User')
         cls.user_2 = User.objects.create(username='User_2')
         cls.user_3 = User.objects.create(username='User_3')
-        cls.authorized_client = Client()
-        cls.authorized_client.force_login(cls.user_1)
-        cls.authorized_client_2 = Client()
-        cls.authorized_client_2.force_login(cls.user_2)
         cls.group_test = Group.objects.create(
             title='Тестовая группа',
             slug='test',
@@ -292,33 +313,52 @@ class FollowTest(TestCase):
             group=cls.group_test,
             author=cls.user_2,
         )
+        cls.user_2_posts_count = 1
         cls.test_follow = Follow.objects.create(
             user=cls.user_1,
             author=cls.user_2
         )
+        cls.initial_follow_count = Follow.objects.count()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user_1)
 
     def test_profile_follow(self):
         """Проверяем что пользователь может подписаться."""
-        follow_count = Follow.objects.count()
         username = self.user_3.username
         self.authorized_client.get(reverse(
             'posts:profile_follow',
             kwargs={'username': username}
         ))
-        self.assertEqual(Follow.objects.count(), follow_count + 1)
+        self.assertEqual(Follow.objects.count(), self.initial_follow_count + 1)
         new_follow = Follow.objects.last()
         self.assertEqual(new_follow.user, self.user_1)
         self.assertEqual(new_follow.author, self.user_3)
 
+    def test_profile_follow_twice(self):
+        """Проверяем что повторная подписка не создаёт дубликат."""
+        username = self.user_2.username
+        self.authorized_client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': username}
+        ))
+        self.assertEqual(Follow.objects.count(),
+                         self.initial_follow_count)
+
+    def test_follow_unique_constraint(self):
+        """Проверяем что база не допускает повторную подписку."""
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(user=self.user_1, author=self.user_2)
+
     def test_profile_unfollow(self):
         """Проверяем что пользователь может отписаться."""
-        follow_count = Follow.objects.count()
         username = self.user_2.username
         self.authorized_client.get(reverse(
             'posts:profile_unfollow',
             kwargs={'username': username}
         ))
-        self.assertEqual(Follow.objects.count(), follow_count - 1)
+        self.assertEqual(Follow.objects.count(), self.initial_follow_count - 1)
 
     def test_add_post_in_follower(self):
         """Проверяем что пост появляется в ленте у тех, кто подписан."""
@@ -331,14 +371,16 @@ class FollowTest(TestCase):
             group=self.group_test,
             author=self.user_3,
         )
-        response = self.authorized_client.get(reverse('posts:follow_index'))
+        with self.assertNumQueries(NUM_QUERIES_FOLLOW_INDEX):
+            response = self.authorized_client.get(
+                reverse('posts:follow_index'))
         first = response.context['page_obj'][0]
         self.assertEqual(first.text, new_post.text)
 
     def test_no_add_post_in_follower(self):
         """Проверяем что пост не появляется в ленте у тех, кто
         не подписан."""
-        posts = Post.objects.filter(author=self.user_2).count()
+        posts = self.user_2_posts_count
         Post.objects.create(
             text='Тестовый пост контент новый',
             group=self.group_test,
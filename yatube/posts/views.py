@@ -1,13 +1,14 @@
 from django.contrib.auth.decorators import login_required
+from django.db.models import Prefetch
 from django.shortcuts import render, get_object_or_404, redirect
 
 from .forms import CommentForm, PostForm
-from .models import Follow, Post, Group, User
+from .models import Comment, Follow, Post, Group, User
 from .utils import paginator
 
 
 def index(request):
-    post_list = Post.objects.all()
+    post_list = Post.objects.select_related('author', 'group')
     page_obj = paginator(request, posts=post_list)
     template = 'posts/index.html'
     context = {
@@ -18,7 +19,7 @@ def index(request):
 
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
+    posts = group.posts.select_related('author', 'group')
     page_obj = paginator(request, posts=posts)
     template = 'posts/group_list.html'
     context = {
@@ -30,7 +31,7 @@ def group_posts(request, slug):
 
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(author=author).select_related('group')
+    posts = author.posts.select_related('author', 'group')
     page_obj = paginator(request, posts=posts)
     template = 'posts/profile.html'
     count = Post.objects.filter(author=author).count()
@@ -43,7 +44,15 @@ def profile(request, username):
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group').prefetch_related(
+            Prefetch(
+                'comments',
+                queryset=Comment.objects.select_related('author')
+            )
+        ),
+        pk=post_id
+    )
     count = Post.objects.filter(
         author__username=post.author.username).count()
     template = 'posts/post_detail.html'
@@ -113,8 +122,9 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = "posts/follow.html"
-    user = get_object_or_404(User, username=request.user)
-    posts = Post.objects.filter(author__following__user=user)
+    posts = Post.objects.filter(
+        author__following__user=request.user
+    ).select_related('author', 'group')
     page_obj = paginator(request, posts)
     context = {
         'page_obj': page_obj,